@@ -1,49 +1,143 @@
-import requests
+import httpx
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import time
 import logging
+import logging.handlers
+import atexit
+import queue
 import json
 import os
-from collections import defaultdict
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
 import asyncio
+import bisect
+import copy
+from cachetools import TTLCache
 from telegram import Bot, Update
 from telegram.ext import Application, CommandHandler, ContextTypes
-import threading
-from queue import Queue
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; fall back to the json module
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # numba is optional
+    njit = None
+
+
+def _json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode('utf-8')
+
+
+def _json_loads(data):
+    """Parse JSON from str or bytes, using orjson when available."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _rapid_trade_mask_numpy(timestamps, trader_ids, min_time_between_trades):
+    """
+    Flag trades (sorted by trader, then time) that follow the same trader's
+    previous trade too closely. Element i compares trade i+1 with trade i.
+    """
+    same_trader = np.diff(trader_ids) == 0
+    return same_trader & (np.diff(timestamps) < min_time_between_trades)
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _rapid_trade_mask(timestamps, trader_ids, min_time_between_trades):
+        mask = np.zeros(max(timestamps.size - 1, 0), dtype=np.bool_)
+        for i in prange(mask.size):
+            mask[i] = (trader_ids[i + 1] == trader_ids[i] and
+                       timestamps[i + 1] - timestamps[i] < min_time_between_trades)
+        return mask
+else:
+    _rapid_trade_mask = _rapid_trade_mask_numpy
 
 class TelegramNotifier:
+    BATCH_WINDOW_SECONDS = 0.5
+    BATCH_SEPARATOR = '\n———\n'
+    MAX_MESSAGE_LENGTH = 4096  # Telegram's limit for a single message
+
     def __init__(self, config):
         self.config = config['telegram']
         self.bot = Bot(token=self.config['bot_token'])
         self.chat_id = self.config['chat_id']
-        self.message_queue = Queue()
+        self.q = asyncio.Queue()
         self._start_message_worker()
 
     def _start_message_worker(self):
-        def worker():
-            async def send_messages():
-                while True:
-                    if not self.message_queue.empty():
-                        msg = self.message_queue.get()
-                        try:
-                            await self.bot.send_message(
-                                chat_id=self.chat_id,
-                                text=msg,
-                                parse_mode='HTML'
-                            )
-                        except Exception as e:
-                            logging.error(f"Error sending Telegram message: {e}")
-                    await asyncio.sleep(1)
-
-            asyncio.run(send_messages())
-
-        thread = threading.Thread(target=worker, daemon=True)
-        thread.start()
+        # Must be called from the running event loop; messages are sent on it.
+        self.loop = asyncio.get_running_loop()
+        self._worker = self.loop.create_task(self._send_messages())
+
+    async def _send_messages(self):
+        pending = None
+        while True:
+            batch = [pending if pending is not None else await self.q.get()]
+            pending = None
+            batch_length = len(batch[0])
+            deadline = self.loop.time() + self.BATCH_WINDOW_SECONDS
+
+            # Coalesce messages arriving within the batch window
+            while True:
+                timeout = deadline - self.loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    msg = await asyncio.wait_for(self.q.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch_length += len(self.BATCH_SEPARATOR) + len(msg)
+                if batch_length > self.MAX_MESSAGE_LENGTH:
+                    # Doesn't fit; send it with the next batch
+                    pending = msg
+                    break
+                batch.append(msg)
+
+            try:
+                await self.bot.send_message(
+                    chat_id=self.chat_id,
+                    text=self.BATCH_SEPARATOR.join(batch),
+                    parse_mode='HTML'
+                )
+            except Exception as e:
+                logging.error(f"Error sending Telegram message: {e}")
+            finally:
+                for _ in batch:
+                    self.q.task_done()
 
     def send_notification(self, message: str):
-        self.message_queue.put(message)
+        # Safe to call from any thread; queue directly when already on the loop
+        try:
+            on_loop = asyncio.get_running_loop() is self.loop
+        except RuntimeError:
+            on_loop = False
+        if on_loop:
+            self.q.put_nowait(message)
+        else:
+            self.loop.call_soon_threadsafe(self.q.put_nowait, message)
+
+    async def close(self, timeout: float = 5):
+        """Send queued messages, waiting up to `timeout` seconds, then stop the worker."""
+        # Let puts scheduled from other threads land before checking the queue
+        await asyncio.sleep(0)
+        try:
+            await asyncio.wait_for(self.q.join(), timeout)
+        except asyncio.TimeoutError:
+            logging.warning("Timed out sending queued Telegram messages")
+        finally:
+            self._worker.cancel()
 
 class BonkBotTrader:
     def __init__(self, config):
@@ -65,6 +159,21 @@ class BonkBotTrader:
             return False
 
 class DexAnalyzer:
+    # Event categorization thresholds, checked in this order by _categorize_event
+    RUG_PRICE_CHANGE = -90
+    PUMP_PRICE_CHANGE = 100
+    PUMP_MIN_VOLUME = 100000
+    HIGH_LIQUIDITY = 1000000
+    HIGH_VOLUME = 500000
+
+    # Status retries for API calls; the transport only retries connection errors
+    RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+    MAX_RETRIES = 3
+    RETRY_BACKOFF_SECONDS = 0.2
+
+    # Pairs vetted ahead of the one get_pair_data is waiting on when max_pairs is set
+    VET_LOOKAHEAD = 4
+
     def __init__(self):
         self.base_url = "https://api.dexscreener.com/latest/dex/search"
         self.pocket_universe_url = "https://api.pocketuniverse.app/v1"
@@ -73,19 +182,112 @@ class DexAnalyzer:
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
         }
         self.setup_logging()
+        self.setup_http()
+        self.setup_caches()
         self.load_config()
         self.setup_pocket_universe()
         self.setup_telegram()
         self.setup_bonkbot()
         self.active_trades = {}
+        self.trade_q = asyncio.Queue()
+        self._pending_trades = set()  # (pair_address, action) queued but not yet executed
+        self._trade_worker = None
+        self._config_lock = threading.Lock()
+        self._config_writer = ThreadPoolExecutor(max_workers=1)
+        self._history = None  # Loaded from analysis_results.jsonl on first report
+        self._history_days = 0  # Largest report window requested so far
+        self._analysis_fp = None  # Opened on first save, kept open and buffered
 
     def setup_logging(self):
-        logging.basicConfig(
-            filename='dex_analysis.log',
-            level=logging.INFO,
-            format='%(asctime)s - %(levelname)s - %(message)s'
+        """Log through a queue so callers never block on file writes."""
+        # httpx logs every request at INFO; keep per-request lines out of the log
+        for name in ('httpx', 'httpcore'):
+            logging.getLogger(name).setLevel(logging.WARNING)
+
+        root = logging.getLogger()
+        if root.handlers:
+            return
+
+        file_handler = logging.FileHandler('dex_analysis.log')
+        file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+
+        log_queue = queue.Queue(-1)
+        listener = logging.handlers.QueueListener(log_queue, file_handler)
+        listener.start()
+        atexit.register(listener.stop)
+
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(logging.INFO)
+
+    def setup_http(self):
+        """Setup a pooled HTTP/2 client shared by all API calls."""
+        transport = httpx.AsyncHTTPTransport(
+            http2=True,
+            limits=httpx.Limits(max_connections=1000, max_keepalive_connections=100),
+            retries=3
+        )
+        self.ahttp = httpx.AsyncClient(
+            headers=self.headers,
+            timeout=httpx.Timeout(10, connect=3.05),
+            transport=transport
         )
 
+    async def _get(self, url: str, **kwargs) -> httpx.Response:
+        """GET with exponential backoff on rate limiting and server errors."""
+        for attempt in range(self.MAX_RETRIES + 1):
+            response = await self.ahttp.get(url, **kwargs)
+            if response.status_code not in self.RETRY_STATUSES or attempt == self.MAX_RETRIES:
+                return response
+            await asyncio.sleep(self.RETRY_BACKOFF_SECONDS * 2 ** attempt)
+
+    def setup_caches(self):
+        """Setup TTL caches for per-token remote lookups."""
+        self._rug_cache = TTLCache(maxsize=10_000, ttl=600)
+        self._pu_cache = TTLCache(maxsize=10_000, ttl=300)
+        # Results are copied in and out so callers can't mutate cached entries
+        # Lookups in progress, so concurrent callers for the same key share one request
+        self._rug_inflight = {}
+        self._pu_inflight = {}
+
+    async def _coalesce(self, inflight: Dict, key, fetch):
+        """
+        Await the in-progress lookup for `key`, starting `fetch()` if there is
+        none. Each caller gets its own copy of the result.
+        """
+        task = inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fetch())
+            inflight[key] = task
+
+            def _forget(done, key=key):
+                if inflight.get(key) is done:
+                    del inflight[key]
+            task.add_done_callback(_forget)
+
+        # Shield so one cancelled caller doesn't cancel the lookup for the others
+        return copy.deepcopy(await asyncio.shield(task))
+
+    async def close(self, timeout: float = 5):
+        """
+        Finish queued trades and notifications, release pooled HTTP connections
+        and flush buffered analyses.
+        """
+        if self._trade_worker:
+            try:
+                await asyncio.wait_for(self.trade_q.join(), timeout)
+            except asyncio.TimeoutError:
+                logging.warning("Timed out executing queued trades")
+            finally:
+                self._trade_worker.cancel()
+                self._trade_worker = None
+        if self.telegram:
+            await self.telegram.close(timeout)
+        await self.ahttp.aclose()
+        self._config_writer.shutdown(wait=True)
+        if self._analysis_fp:
+            self._analysis_fp.close()
+            self._analysis_fp = None
+
     def setup_pocket_universe(self):
         """Setup Pocket Universe API headers if API key is available."""
         if self.config['volume_verification'].get('pocket_universe_api_key'):
@@ -100,11 +302,14 @@ class DexAnalyzer:
     def load_config(self):
         """Load configuration from config.json file."""
         try:
-            with open('config.json', 'r') as f:
-                self.config = json.load(f)
+            with open('config.json', 'rb') as f:
+                self.config = _json_loads(f.read())
+            self._config_loaded = True
             logging.info("Configuration loaded successfully")
         except Exception as e:
             logging.error(f"Error loading configuration: {e}")
+            # Defaults are never written back, so a broken config.json is left alone
+            self._config_loaded = False
             self.config = {
                 "filters": {},
                 "blacklisted_tokens": [],
@@ -123,6 +328,12 @@ class DexAnalyzer:
                     }
                 }
             }
+        self._refresh_blacklists()
+
+    def _refresh_blacklists(self):
+        """Rebuild the lower-cased blacklist sets used for lookups."""
+        self._blacklist_tokens = frozenset(addr.lower() for addr in self.config['blacklisted_tokens'])
+        self._blacklist_deployers = frozenset(addr.lower() for addr in self.config['blacklisted_deployers'])
 
     def setup_telegram(self):
         """Setup Telegram notifications"""
@@ -181,6 +392,32 @@ class DexAnalyzer:
         )
         self.telegram.send_notification(message)
 
+    def _queue_trade(self, pair_data: Dict, action: str) -> bool:
+        """
+        Queue a trade for the background worker. Returns False if the same
+        trade is already pending for this pair.
+        """
+        key = (pair_data['pairAddress'], action)
+        if key in self._pending_trades:
+            return False
+
+        if self._trade_worker is None:
+            self._trade_worker = asyncio.get_running_loop().create_task(self._process_trades())
+        self._pending_trades.add(key)
+        self.trade_q.put_nowait((pair_data, action))
+        return True
+
+    async def _process_trades(self):
+        while True:
+            pair_data, action = await self.trade_q.get()
+            try:
+                await self.execute_trade(pair_data, action)
+            except Exception as e:
+                logging.error(f"Error processing queued trade: {e}")
+            finally:
+                self._pending_trades.discard((pair_data['pairAddress'], action))
+                self.trade_q.task_done()
+
     def check_active_trades(self, pair_data: Dict):
         """Check active trades for stop loss and take profit"""
         if pair_data['pairAddress'] not in self.active_trades:
@@ -194,29 +431,30 @@ class DexAnalyzer:
         config = self.config['telegram']['bonkbot']
         
         if price_change <= -config['stop_loss_percentage']:
-            asyncio.create_task(self.execute_trade(pair_data, 'sell'))
-            self.telegram.send_notification(
-                f"🔴 Stop Loss triggered for {pair_data['baseToken']['name']}\n"
-                f"Loss: {price_change:.2f}%"
-            )
+            if self._queue_trade(pair_data, 'sell'):
+                self.telegram.send_notification(
+                    f"🔴 Stop Loss triggered for {pair_data['baseToken']['name']}\n"
+                    f"Loss: {price_change:.2f}%"
+                )
         elif price_change >= config['take_profit_percentage']:
-            asyncio.create_task(self.execute_trade(pair_data, 'sell'))
-            self.telegram.send_notification(
-                f"🟢 Take Profit triggered for {pair_data['baseToken']['name']}\n"
-                f"Profit: {price_change:.2f}%"
-            )
+            if self._queue_trade(pair_data, 'sell'):
+                self.telegram.send_notification(
+                    f"🟢 Take Profit triggered for {pair_data['baseToken']['name']}\n"
+                    f"Profit: {price_change:.2f}%"
+                )
 
     def is_token_blacklisted(self, token_address):
         """Check if token is blacklisted."""
-        return token_address.lower() in (addr.lower() for addr in self.config['blacklisted_tokens'])
+        return token_address.lower() in self._blacklist_tokens
 
     def is_deployer_blacklisted(self, deployer_address):
         """Check if deployer is blacklisted."""
-        return deployer_address.lower() in (addr.lower() for addr in self.config['blacklisted_deployers'])
+        return deployer_address.lower() in self._blacklist_deployers
 
-    def check_volume_legitimacy(self, pair_data: Dict) -> Dict:
+    def check_volume_legitimacy(self, pair_data: Dict, pu_analysis: Optional[Dict] = None) -> Dict:
         """
         Check if the trading volume is legitimate using multiple methods.
+        `pu_analysis` is the result of `check_pocket_universe` for the pair, if any.
         Returns a dictionary with analysis results.
         """
         volume_config = self.config['volume_verification']
@@ -229,13 +467,11 @@ class DexAnalyzer:
             'unique_traders': 0
         }
 
-        # Check with Pocket Universe if available
-        if self.pocket_headers:
-            pu_analysis = self.check_pocket_universe(pair_data['pairAddress'])
-            if pu_analysis:
-                result.update(pu_analysis)
-                if not pu_analysis['is_legitimate']:
-                    return result
+        # Use Pocket Universe results if available
+        if pu_analysis:
+            result.update(pu_analysis)
+            if not pu_analysis['is_legitimate']:
+                return result
 
         # Perform our own analysis
         trades = self.analyze_trading_patterns(pair_data)
@@ -265,25 +501,38 @@ class DexAnalyzer:
 
         return result
 
-    def check_pocket_universe(self, pair_address: str) -> Optional[Dict]:
+    async def check_pocket_universe(self, pair_address: str) -> Optional[Dict]:
         """Query Pocket Universe API for volume analysis."""
         if not self.pocket_headers:
             return None
 
+        cached = self._pu_cache.get(pair_address)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        return await self._coalesce(
+            self._pu_inflight,
+            pair_address,
+            lambda: self._fetch_pocket_universe(pair_address)
+        )
+
+    async def _fetch_pocket_universe(self, pair_address: str) -> Optional[Dict]:
         try:
-            response = requests.get(
+            response = await self._get(
                 f"{self.pocket_universe_url}/pairs/{pair_address}/analysis",
                 headers=self.pocket_headers
             )
             response.raise_for_status()
-            data = response.json()
+            data = _json_loads(response.content)
 
-            return {
+            result = {
                 'is_legitimate': data['realVolumeRatio'] >= self.config['volume_verification']['min_real_volume_ratio'],
                 'real_volume_ratio': data['realVolumeRatio'],
                 'flags': data.get('flags', []),
                 'source': 'pocket_universe'
             }
+            self._pu_cache[pair_address] = copy.deepcopy(result)
+            return result
         except Exception as e:
             logging.error(f"Error querying Pocket Universe API: {e}")
             return None
@@ -296,53 +545,68 @@ class DexAnalyzer:
         
         # Get detailed trades (this would need to be implemented based on available data)
         trades = self.get_detailed_trades(pair_data)
+        traders = trades['trader']
+        timestamps = trades['timestamp']
         
         result = {
-            'unique_traders': len(set(trade['trader'] for trade in trades)),
-            'total_trades': len(trades),
+            'unique_traders': 0,
+            'total_trades': int(traders.size),
             'wash_trade_count': 0,
             'suspicious_timing_patterns': []
         }
+        if not traders.size:
+            return result
 
-        # Analyze trade patterns
-        trader_trades = defaultdict(list)
-        amount_frequency = defaultdict(int)
-        
-        for trade in trades:
-            trader = trade['trader']
-            trader_trades[trader].append(trade)
-            amount_frequency[trade['amount']] += 1
-
-        # Check for self-trades and suspicious patterns
-        for trader, trades_list in trader_trades.items():
-            if len(trades_list) > config['max_self_trades']:
-                result['wash_trade_count'] += len(trades_list)
-
-            # Check time between trades
-            trades_list.sort(key=lambda x: x['timestamp'])
-            for i in range(1, len(trades_list)):
-                time_diff = trades_list[i]['timestamp'] - trades_list[i-1]['timestamp']
-                if time_diff < config['min_time_between_trades_seconds']:
-                    result['suspicious_timing_patterns'].append(
-                        f"Rapid trades from {trader}: {time_diff}s between trades"
-                    )
-
-        # Check for repetitive amounts
-        for amount, count in amount_frequency.items():
-            if count > config['max_repetitive_amounts']:
+        if np.all(traders[1:] > traders[:-1]):
+            # Strictly increasing ids (as generated by get_detailed_trades) are
+            # all distinct: one trade per trader, so no self-trades or rapid repeats
+            result['unique_traders'] = result['total_trades']
+            if config['max_self_trades'] < 1:
+                result['wash_trade_count'] = result['total_trades']
+        else:
+            # Group trades by trader, time-ordered within each group, in one sort
+            order = np.lexsort((timestamps, traders))
+            sorted_traders = traders[order]
+            sorted_timestamps = timestamps[order]
+            group_starts = np.flatnonzero(np.r_[True, sorted_traders[1:] != sorted_traders[:-1]])
+            trade_counts = np.diff(np.r_[group_starts, sorted_traders.size])
+            result['unique_traders'] = int(group_starts.size)
+
+            # Check for self-trades
+            result['wash_trade_count'] = int(trade_counts[trade_counts > config['max_self_trades']].sum())
+
+            # Check time between consecutive trades of the same trader
+            rapid = _rapid_trade_mask(
+                sorted_timestamps,
+                sorted_traders,
+                config['min_time_between_trades_seconds']
+            )
+            for i in np.flatnonzero(rapid):
                 result['suspicious_timing_patterns'].append(
-                    f"Repetitive trade amount: {amount} used {count} times"
+                    f"Rapid trades from trader_{sorted_traders[i + 1]}: "
+                    f"{sorted_timestamps[i + 1] - sorted_timestamps[i]}s between trades"
                 )
 
+        # Check for repetitive amounts
+        unique_amounts, amount_counts = np.unique(trades['amount'], return_counts=True)
+        for i in np.flatnonzero(amount_counts > config['max_repetitive_amounts']):
+            result['suspicious_timing_patterns'].append(
+                f"Repetitive trade amount: {float(unique_amounts[i])} used {amount_counts[i]} times"
+            )
+
         return result
 
-    def get_detailed_trades(self, pair_data: Dict) -> List[Dict]:
+    def get_detailed_trades(self, pair_data: Dict) -> Dict[str, np.ndarray]:
         """
         Extract detailed trade information from pair data.
         This is a simplified version - in practice, you'd want to get this data
         from an on-chain source or detailed API.
+        Returns parallel arrays of trader ids, timestamps, amounts and sides
+        (0 = buy, 1 = sell).
         """
-        trades = []
+        timestamps, amounts, sides = [], [], []
+        now = int(time.time())
+        total = 0
         
         # Convert basic transaction data to trade records
         for period in ['m5', 'h1', 'h6', 'h24']:
@@ -354,57 +618,79 @@ class DexAnalyzer:
                     'h24': 86400
                 }[period]
                 
-                base_timestamp = int(time.time()) - timestamp_offset
+                base_timestamp = now - timestamp_offset
+                volume = pair_data['volume'].get(period, 0)
                 
                 # Create synthetic trade records from transaction counts
-                for _ in range(pair_data['txns'][period]['buys']):
-                    trades.append({
-                        'trader': f"trader_{len(trades)}",
-                        'timestamp': base_timestamp + (len(trades) * 60),
-                        'amount': pair_data['volume'][period] / max(pair_data['txns'][period]['buys'], 1),
-                        'type': 'buy'
-                    })
-                
-                for _ in range(pair_data['txns'][period]['sells']):
-                    trades.append({
-                        'trader': f"trader_{len(trades)}",
-                        'timestamp': base_timestamp + (len(trades) * 60),
-                        'amount': pair_data['volume'][period] / max(pair_data['txns'][period]['sells'], 1),
-                        'type': 'sell'
-                    })
-
-        return trades
-
-    def passes_filters(self, pair_data):
-        """Check if pair passes all configured filters."""
+                for side, count in enumerate((pair_data['txns'][period]['buys'],
+                                              pair_data['txns'][period]['sells'])):
+                    timestamps.append(base_timestamp + (total + np.arange(count, dtype=np.int64)) * 60)
+                    amounts.append(np.full(count, volume / max(count, 1), dtype=np.float64))
+                    sides.append(np.full(count, side, dtype=np.int8))
+                    total += count
+
+        # Every synthetic trade gets its own trader id
+        return {
+            'trader': np.arange(total, dtype=np.int64),
+            'timestamp': np.concatenate(timestamps) if timestamps else np.empty(0, dtype=np.int64),
+            'amount': np.concatenate(amounts) if amounts else np.empty(0, dtype=np.float64),
+            'side': np.concatenate(sides) if sides else np.empty(0, dtype=np.int8)
+        }
+
+    def _local_filters(self, pair_data, now_ts: float) -> bool:
+        """Check the filters that need no remote calls."""
         filters = self.config['filters']
-        
-        # Basic filters
+
+        if (self.is_token_blacklisted(pair_data['baseToken']['address']) or
+            self.is_token_blacklisted(pair_data['quoteToken']['address'])):
+            return False
+
         if float(pair_data['liquidity']['usd']) < filters.get('min_liquidity_usd', 0):
-            logging.info(f"Pair {pair_data['pairAddress']} failed liquidity filter")
+            logging.info("Pair %s failed liquidity filter", pair_data['pairAddress'])
             return False
             
         if float(pair_data['volume']['h24']) < filters.get('min_volume_24h', 0):
-            logging.info(f"Pair {pair_data['pairAddress']} failed volume filter")
+            logging.info("Pair %s failed volume filter", pair_data['pairAddress'])
             return False
 
-        # Check RugCheck.xyz status
-        rugcheck_result = self.check_rugcheck_status(
-            pair_data['baseToken']['address'],
-            pair_data['chainId']
+        # Age filter
+        if 'pairCreatedAt' in pair_data:
+            pair_age_hours = (now_ts - pair_data['pairCreatedAt'] * 1e-3) / 3600
+            if pair_age_hours < filters.get('min_age_hours', 0):
+                logging.info("Pair %s failed age filter", pair_data['pairAddress'])
+                return False
+
+        return True
+
+    async def passes_filters(self, pair_data, now_ts: Optional[float] = None):
+        """
+        Check if pair passes all configured filters, cheapest first:
+        local checks, then remote lookups, then the synthetic volume analysis.
+        """
+        if now_ts is None:
+            now_ts = time.time()
+        if not self._local_filters(pair_data, now_ts):
+            return False
+
+        # Query RugCheck.xyz and Pocket Universe concurrently
+        rugcheck_result, pu_analysis = await asyncio.gather(
+            self.check_rugcheck_status(
+                pair_data['baseToken']['address'],
+                pair_data['chainId']
+            ),
+            self.check_pocket_universe(pair_data['pairAddress'])
         )
         
         if not rugcheck_result['is_safe']:
-            logging.info(f"Pair {pair_data['pairAddress']} failed RugCheck verification: {rugcheck_result['status']}")
+            logging.info("Pair %s failed RugCheck verification: %s", pair_data['pairAddress'], rugcheck_result['status'])
             pair_data['rugcheck_analysis'] = rugcheck_result
             return False
 
         # Check for supply bundling
         if rugcheck_result['is_supply_bundled']:
-            logging.info(f"Pair {pair_data['pairAddress']} has bundled supply")
+            logging.info("Pair %s has bundled supply", pair_data['pairAddress'])
             # Add deployer to blacklist if supply is bundled
             if rugcheck_result.get('deployer'):
-                self.config['blacklisted_deployers'].append(rugcheck_result['deployer'])
                 self._save_blacklist_update(rugcheck_result['deployer'])
             return False
 
@@ -412,41 +698,42 @@ class DexAnalyzer:
         pair_data['rugcheck_analysis'] = rugcheck_result
 
         # Check volume legitimacy
-        volume_check = self.check_volume_legitimacy(pair_data)
+        volume_check = self.check_volume_legitimacy(pair_data, pu_analysis)
         if not volume_check['is_legitimate']:
-            logging.info(f"Pair {pair_data['pairAddress']} failed volume legitimacy check: {volume_check['flags']}")
+            logging.info("Pair %s failed volume legitimacy check: %s", pair_data['pairAddress'], volume_check['flags'])
             pair_data['volume_analysis'] = volume_check
             return False
 
-        # Age filter
-        if 'pairCreatedAt' in pair_data:
-            pair_age_hours = (datetime.now() - datetime.fromtimestamp(pair_data['pairCreatedAt']/1000)).total_seconds() / 3600
-            if pair_age_hours < filters.get('min_age_hours', 0):
-                logging.info(f"Pair {pair_data['pairAddress']} failed age filter")
-                return False
-
         return True
 
-    def check_rugcheck_status(self, token_address: str, chain_id: str) -> Dict:
+    async def check_rugcheck_status(self, token_address: str, chain_id: str) -> Dict:
         """
         Check token status on RugCheck.xyz
         """
+        key = (chain_id, token_address)
+        cached = self._rug_cache.get(key)
+        if cached is not None:
+            return copy.deepcopy(cached)
+
+        return await self._coalesce(
+            self._rug_inflight,
+            key,
+            lambda: self._fetch_rugcheck_status(token_address, chain_id)
+        )
+
+    async def _fetch_rugcheck_status(self, token_address: str, chain_id: str) -> Dict:
+        key = (chain_id, token_address)
         try:
-            # First get the contract analysis
-            response = requests.get(
-                f"{self.rugcheck_url}/tokens/{chain_id}/{token_address}/analysis",
-                headers=self.headers
+            # Get the contract analysis and supply information together
+            response, supply_response = await asyncio.gather(
+                self._get(f"{self.rugcheck_url}/tokens/{chain_id}/{token_address}/analysis"),
+                self._get(f"{self.rugcheck_url}/tokens/{chain_id}/{token_address}/supply")
             )
             response.raise_for_status()
-            analysis = response.json()
+            analysis = _json_loads(response.content)
 
-            # Get supply information
-            supply_response = requests.get(
-                f"{self.rugcheck_url}/tokens/{chain_id}/{token_address}/supply",
-                headers=self.headers
-            )
             supply_response.raise_for_status()
-            supply_data = supply_response.json()
+            supply_data = _json_loads(supply_response.content)
 
             result = {
                 'is_safe': analysis.get('status') == 'GOOD',
@@ -471,6 +758,7 @@ class DexAnalyzer:
                     'holder_concentration': supply_data.get('holderConcentration', 0)
                 }
 
+            self._rug_cache[key] = copy.deepcopy(result)
             return result
 
         except Exception as e:
@@ -498,14 +786,10 @@ class DexAnalyzer:
             if top_holders[0].get('percentage', 0) > 50:
                 suspicious_patterns.append('Single holder dominance')
 
-            # Check for multiple addresses with similar holdings
-            similar_holdings = []
-            for i in range(len(top_holders) - 1):
-                for j in range(i + 1, len(top_holders)):
-                    if abs(top_holders[i].get('percentage', 0) - top_holders[j].get('percentage', 0)) < 1:
-                        similar_holdings.append((top_holders[i]['address'], top_holders[j]['address']))
-
-            if similar_holdings:
+            # Check for multiple addresses with similar holdings; after sorting,
+            # some pair is within 1% of each other iff some adjacent pair is
+            percentages = sorted(holder.get('percentage', 0) for holder in top_holders)
+            if any(high - low < 1 for low, high in zip(percentages, percentages[1:])):
                 suspicious_patterns.append('Similar holding patterns detected')
 
         # Check for unusual circulating supply ratio
@@ -520,18 +804,29 @@ class DexAnalyzer:
         return len(suspicious_patterns) > 0
 
     def _save_blacklist_update(self, deployer_address: str):
-        """Save updated blacklist to config file"""
+        """Add deployer to the blacklist and save the config file in the background"""
+        if self.is_deployer_blacklisted(deployer_address):
+            return
+
+        self.config['blacklisted_deployers'].append(deployer_address)
+        self._refresh_blacklists()
+        logging.info(f"Added deployer {deployer_address} to blacklist")
+
+        if not self._config_loaded:
+            logging.error("Not saving blacklist update: config.json was not loaded")
+            return
+
+        # Serialize now so later config changes can't race the write
+        snapshot = _json_dumps(self.config, indent=True)
+        self._config_writer.submit(self._write_config_snapshot, snapshot)
+
+    def _write_config_snapshot(self, snapshot: bytes):
+        """Atomically replace config.json with the given contents"""
         try:
-            with open('config.json', 'r') as f:
-                config = json.load(f)
-            
-            if deployer_address not in config['blacklisted_deployers']:
-                config['blacklisted_deployers'].append(deployer_address)
-                
-                with open('config.json', 'w') as f:
-                    json.dump(config, f, indent=4)
-                
-                logging.info(f"Added deployer {deployer_address} to blacklist")
+            with self._config_lock:
+                with open('config.json.tmp', 'wb') as f:
+                    f.write(snapshot)
+                os.replace('config.json.tmp', 'config.json')
         except Exception as e:
             logging.error(f"Error updating blacklist: {e}")
 
@@ -554,35 +849,65 @@ class DexAnalyzer:
 
         return suspicious_flags
 
-    def get_pair_data(self, pair_address):
-        """Fetch data for a specific trading pair."""
+    async def _vet_pair(self, pair, now_ts: float) -> Optional[Dict]:
+        """Run filter checks on a pair, returning it if it passes."""
+        if not await self.passes_filters(pair, now_ts):
+            return None
+
+        # Add suspicious pattern analysis
+        suspicious_flags = self.check_suspicious_patterns(pair)
+        if suspicious_flags:
+            pair['suspicious_flags'] = suspicious_flags
+
+        return pair
+
+    async def get_pair_data(self, pair_address, max_pairs: Optional[int] = 1):
+        """
+        Fetch data for a specific trading pair.
+        Keeps the first `max_pairs` passing pairs in DexScreener's order (None
+        keeps every passing pair). Pairs are vetted concurrently in a window of
+        VET_LOOKAHEAD (or max_pairs, if larger), and no pairs beyond that window
+        are looked up once enough have passed.
+        """
+        if max_pairs is not None and max_pairs < 1:
+            raise ValueError("max_pairs must be a positive integer or None")
+
         try:
-            response = requests.get(
+            response = await self._get(
                 f"{self.base_url}",
-                params={'q': pair_address},
-                headers=self.headers
+                params={'q': pair_address}
             )
             response.raise_for_status()
-            data = response.json()
-
-            # Filter and analyze each pair
+            data = _json_loads(response.content)
+
+            # Filter and analyze pairs concurrently within a look-ahead window,
+            # collecting results in order
+            now_ts = time.time()
+            candidates = data.get('pairs') or []
+            if max_pairs is None:
+                lookahead = len(candidates)
+            else:
+                lookahead = max(max_pairs, self.VET_LOOKAHEAD)
+            tasks = []
             filtered_pairs = []
-            for pair in data.get('pairs', []):
-                if (not self.is_token_blacklisted(pair['baseToken']['address']) and
-                    not self.is_token_blacklisted(pair['quoteToken']['address']) and
-                    self.passes_filters(pair)):
-                    
-                    # Add suspicious pattern analysis
-                    suspicious_flags = self.check_suspicious_patterns(pair)
-                    if suspicious_flags:
-                        pair['suspicious_flags'] = suspicious_flags
-                    
-                    filtered_pairs.append(pair)
-            
+            try:
+                for head in range(len(candidates)):
+                    while len(tasks) < len(candidates) and len(tasks) - head < lookahead:
+                        tasks.append(asyncio.ensure_future(self._vet_pair(candidates[len(tasks)], now_ts)))
+                    pair = await tasks[head]
+                    if pair is not None:
+                        filtered_pairs.append(pair)
+                        if max_pairs is not None and len(filtered_pairs) >= max_pairs:
+                            break
+            finally:
+                for task in tasks:
+                    task.cancel()
+                await asyncio.gather(*tasks, return_exceptions=True)
+
             data['pairs'] = filtered_pairs
             return data
             
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, ValueError) as e:
             logging.error(f"Error fetching pair data: {e}")
             return None
 
@@ -626,16 +951,15 @@ class DexAnalyzer:
 
     def _categorize_event(self, price_change, price_data):
         """Categorize the type of event based on various indicators."""
-        liquidity = float(price_data['liquidity']['usd'])
-        volume = float(price_data['volume']['h24'])
-        
-        if price_change <= -90:
+        if price_change <= self.RUG_PRICE_CHANGE:
             return 'potential_rug'
-        elif price_change >= 100 and volume > 100000:
+
+        volume = float(price_data['volume']['h24'])
+        if price_change >= self.PUMP_PRICE_CHANGE and volume > self.PUMP_MIN_VOLUME:
             return 'significant_pump'
-        elif liquidity > 1000000 and volume > 500000:
+        elif volume > self.HIGH_VOLUME and float(price_data['liquidity']['usd']) > self.HIGH_LIQUIDITY:
             return 'high_liquidity_volume'
-        elif 'cex' in price_data.get('labels', []):
+        elif 'cex' in (price_data.get('labels') or ()):
             return 'cex_listed'
         elif 'suspicious_flags' in price_data:
             return 'suspicious_activity'
@@ -645,16 +969,39 @@ class DexAnalyzer:
     def _save_analysis(self, analysis):
         """Save analysis results to a file."""
         try:
-            with open('analysis_results.jsonl', 'a') as f:
-                json.dump(analysis, f)
-                f.write('\n')
+            if self._analysis_fp is None:
+                self._analysis_fp = open('analysis_results.jsonl', 'ab', buffering=1 << 16)
+                atexit.register(self._analysis_fp.close)
+            self._analysis_fp.write(_json_dumps(analysis) + b'\n')
         except IOError as e:
             logging.error(f"Error saving analysis: {e}")
+            return
+        if self._history is not None:
+            self._history.append(analysis)
+
+    def _load_history(self) -> List[Dict]:
+        """Read previously saved analyses from disk."""
+        history = []
+        if self._analysis_fp:
+            self._analysis_fp.flush()
+        if os.path.exists('analysis_results.jsonl'):
+            with open('analysis_results.jsonl', 'rb') as f:
+                history = [_json_loads(line) for line in f if line.strip()]
+        return history
 
     def generate_report(self, days=7):
         """Generate a summary report of recent analyses."""
         try:
-            df = pd.read_json('analysis_results.jsonl', lines=True)
+            if self._history is None:
+                self._history = self._load_history()
+
+            # Drop records older than any report window asked for; history is
+            # in save order, so ISO timestamps are sorted
+            self._history_days = max(self._history_days, days)
+            keep_after = (datetime.now() - timedelta(days=self._history_days)).isoformat()
+            del self._history[:bisect.bisect_right(self._history, keep_after, key=lambda r: r['timestamp'])]
+
+            df = pd.DataFrame(self._history)
             df['timestamp'] = pd.to_datetime(df['timestamp'])
             recent_df = df[df['timestamp'] > datetime.now() - timedelta(days=days)]
             
@@ -680,7 +1027,7 @@ async def main():
     # Using WETH-USDC pair on Uniswap V2
     pair_address = "0xb4e16d0168e52d35cacd2c6185b44281ec28c9dc"
     print(f"Fetching data for pair: {pair_address}")
-    pair_data = analyzer.get_pair_data(pair_address)
+    pair_data = await analyzer.get_pair_data(pair_address)
     
     if pair_data:
         print("Got pair data:", json.dumps(pair_data, indent=2))
@@ -700,5 +1047,7 @@ async def main():
     else:
         print("Failed to get pair data")
 
+    await analyzer.close()
+
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file